@@ -1,12 +1,16 @@
-import json
 from pathlib import Path
+from datetime import timedelta
 from typing import Dict, Optional, List
 import os
-import requests
-import pyttsx3
+import orjson
+from requests.adapters import HTTPAdapter
+import requests_cache
 import pyperclip
 import math
 import argparse
+from ed_speech import Speaker
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 # Material IDs from edtools.cc - these aren't documented anywhere, had to find them by inspecting network requests...so could potentially change
 MATERIAL_IDS = {
@@ -24,6 +28,30 @@ MATERIAL_IDS = {
     'grandidierite': 348
 }
 
+# Commodity names EDTools expects in trade requests, by material ID
+COMMODITY_NAMES = {
+    83: 'Painite',
+    276: 'LowTemperatureDiamond',
+    350: 'Opal',
+    347: 'Benitoite',
+    344: 'Serendibite',
+    345: 'Monazite',
+    346: 'Musgravite',
+    46: 'Platinum',
+    348: 'Grandidierite'
+}
+
+# Cache edtools.cc responses in the user cache folder so re-running the scripts while mining is instant.
+# System coordinates never change, prices are only worth keeping for a few minutes
+CACHE_NAME = 'edtools_cache'
+COORDS_CACHE_TTL = timedelta(days=30)
+CACHE_TTL = timedelta(minutes=10)
+
+def is_cacheable(response) -> bool:
+    """Don't cache failed coordinate lookups - sys_coord.php reports those as a 200 with an error body,
+    and we'd otherwise be stuck with the error for the whole coordinate cache lifetime."""
+    return 'sys_coord.php' not in response.url or b'"error"' not in response.content
+
 def round_to_50k(price: int) -> str:
     """Round a price to the nearest 50,000 and return as string with K notation.
     Elite Dangerous prices tend to move in 50k increments, so this makes the numbers more readable."""
@@ -42,14 +70,28 @@ class EDCargoReader:
             'Accept-Language': 'en-US,en;q=0.9'
         }
         
-        # Initialize text-to-speech only if enabled
-        self.engine = pyttsx3.init() if voice_enabled else None
+        # Reuse one session so back-to-back requests to edtools.cc share the same
+        # connection instead of doing a new TCP/TLS handshake every time, and answers
+        # repeated lookups from the on-disk cache without touching the network at all
+        self.session = requests_cache.CachedSession(
+            CACHE_NAME,
+            backend='sqlite',
+            use_cache_dir=True,
+            expire_after=CACHE_TTL,
+            urls_expire_after={'edtools.cc/sys_coord.php*': COORDS_CACHE_TTL},
+            filter_fn=is_cacheable
+        )
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        
+        # Text-to-speech is slow to start up, so it's only initialized the first time we speak
+        self.voice_enabled = voice_enabled
+        self.speaker = Speaker()
 
     def speak(self, text: str):
         """Speak the given text if voice is enabled"""
-        if self.engine:
-            self.engine.say(text)
-            self.engine.runAndWait()
+        if self.voice_enabled:
+            self.speaker.say(text)
 
     def get_main_cargo(self) -> Optional[str]:
         """Read Cargo.json to find the main non-drone cargo material.
@@ -58,45 +100,36 @@ class EDCargoReader:
         if not cargo_file.exists():
             raise FileNotFoundError(f"Cargo file not found at {cargo_file}")
         
-        with open(cargo_file, 'r', encoding='utf-8') as f:
+        with open(cargo_file, 'rb') as f:
             try:
-                cargo_data = json.load(f)
+                cargo_data = orjson.loads(f.read())
                 
                 if 'Inventory' not in cargo_data:
                     return None
                 
-                # Filter out drones and find highest count item
-                non_drone_items = [
-                    item for item in cargo_data['Inventory']
-                    if item.get('Name', '').lower() != 'drones' 
-                    and item.get('Name_Localised', '').lower() != 'limpet'
-                ]
+                # Filter out drones and find highest count item in a single pass
+                highest_item = max(
+                    (
+                        item for item in cargo_data['Inventory']
+                        if item.get('Name', '').lower() != 'drones'
+                        and item.get('Name_Localised', '').lower() != 'limpet'
+                    ),
+                    key=lambda x: x.get('Count', 0),
+                    default=None
+                )
                 
-                if not non_drone_items:
+                if highest_item is None:
                     return None
                 
-                # Get the item with highest count
-                highest_item = max(non_drone_items, key=lambda x: x.get('Count', 0))
                 return highest_item.get('Name_Localised', highest_item.get('Name', 'Unknown'))
                 
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 return None
 
     def get_commodity_name(self, material_id: int) -> str:
         """Get the correct name to use in trade requests.
         EDTools uses slightly different names than the game for some materials."""
-        mapping = {
-            83: 'Painite',
-            276: 'LowTemperatureDiamond',
-            350: 'Opal',
-            347: 'Benitoite',
-            344: 'Serendibite',
-            345: 'Monazite',
-            346: 'Musgravite',
-            46: 'Platinum',
-            348: 'Grandidierite'
-        }
-        return mapping.get(material_id, '')
+        return COMMODITY_NAMES.get(material_id, '')
 
     def get_distance(self, sys1_coords: Dict, sys2_coords: Dict) -> float:
         """Calculate distance between two systems using their coordinates.
@@ -117,76 +150,85 @@ class EDCargoReader:
             return
         
         try:
-            # First get system coordinates - needed to calculate real distances
-            coords_response = requests.get(
-                f"https://edtools.cc/sys_coord.php?s={current_system}", 
-                headers=self.headers
-            )
+            # Coordinates and trade data don't depend on each other, so fetch them
+            # at the same time - we only wait for the slower of the two requests
+            request_name = self.get_commodity_name(material_id)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                coords_future = executor.submit(
+                    self.session.get,
+                    f"https://edtools.cc/sys_coord.php?s={current_system}"
+                )
+                trade_future = executor.submit(
+                    self.session.get,
+                    f"https://edtools.cc/trd.php?f=json&cmdy={request_name}"
+                )
+                coords_response = coords_future.result()
+                trade_response = trade_future.result()
+            
+            # System coordinates are needed to calculate real distances
             coords_response.raise_for_status()
-            coords_data = coords_response.json()
+            coords_data = orjson.loads(coords_response.content)
             
             if 'error' in coords_data:
                 print(f"Error: {coords_data['error']}")
                 return
                 
-            # Get trading data
-            request_name = self.get_commodity_name(material_id)
-            trade_response = requests.get(
-                f"https://edtools.cc/trd.php?f=json&cmdy={request_name}",
-                headers=self.headers
-            )
             trade_response.raise_for_status()
-            trade_data = trade_response.json()
+            trade_data = orjson.loads(trade_response.content)
             
             if not trade_data:
                 print("No stations found")
                 return
             
-            # Calculate distances from reference system
+            # Calculate squared distances from reference system - they're enough for the
+            # 100 Ly cutoff and for comparing stations, so real distances are only
+            # worked out for the few stations we need
             ref_coords = coords_data['coords']
-            valid_stations = []
+            xyz = itemgetter('x', 'y', 'z')  # avoids re-indexing ['coords'] per axis
+            rx, ry, rz = xyz(ref_coords)
+            in_range = []  # (station, squared distance) pairs
             
             for station in trade_data:
-                if 'coords' in station:
-                    # Skip stations with wrong pad size
-                    pad = station.get('pad', '').upper()
-                    if pad not in acceptable_pads:
-                        continue
-                        
-                    distance = self.get_distance(ref_coords, station['coords'])
-                    if distance <= 100:  # Only consider stations within 100 Ly
-                        station['distance'] = distance
-                        valid_stations.append(station)
+                # Skip stations without coordinates or with wrong pad size
+                if 'coords' not in station or station.get('pad', '').upper() not in acceptable_pads:
+                    continue
+                    
+                x, y, z = xyz(station['coords'])
+                dx, dy, dz = x - rx, y - ry, z - rz
+                distance_sq = dx * dx + dy * dy + dz * dz
+                if distance_sq <= 100 * 100:  # Only consider stations within 100 Ly
+                    in_range.append((station, distance_sq))
             
-            if not valid_stations:
+            if not in_range:
                 pads_str = '/'.join(acceptable_pads)
                 print(f"No suitable stations found within 100 Ly ({pads_str} pads only)")
                 return
                 
-            # Sort by price to find the best price
-            by_price = sorted(valid_stations, key=lambda x: x.get('price', 0), reverse=True)
-            best_price = by_price[0]['price']
+            # First pass: find the best price - we only need the top station, not a full sort
+            best_price_station, _ = max(in_range, key=lambda x: x[0].get('price', 0))
+            best_price = best_price_station['price']
+            best_price_distance = self.get_distance(ref_coords, best_price_station['coords'])
             
-            # Find stations that are:
+            # Second pass: find the closest station that is:
             # 1. Within 100k cr of best price
             # 2. At least 20 Ly closer than the best price station
-            # This helps find "good enough" prices that are much closer
-            best_price_distance = by_price[0]['distance']
-            candidates = []
-            
-            for station in valid_stations:
-                price_diff = best_price - station['price']
-                distance_diff = best_price_distance - station['distance']
-                
-                if price_diff <= 100000 and distance_diff >= 20:
-                    candidates.append(station)
+            # This helps find "good enough" prices that are much closer.
+            # "20 Ly closer" means distance <= best_price_distance - 20, which we can
+            # check on squared distances (no station can be closer than 0 Ly)
+            # If there's no such station we use the best price station
+            result = best_price_station
+            if best_price_distance >= 20:
+                closer_limit_sq = (best_price_distance - 20) ** 2
+                closest_sq = None
+                for station, distance_sq in in_range:
+                    price_diff = best_price - station['price']
                     
-            # If we found a closer station with similar price, use it
-            # Otherwise use the best price station
-            if candidates:
-                result = sorted(candidates, key=lambda x: x['distance'])[0]
-            else:
-                result = by_price[0]
+                    if price_diff <= 100000 and distance_sq <= closer_limit_sq:
+                        if closest_sq is None or distance_sq < closest_sq:
+                            result = station
+                            closest_sq = distance_sq
+            
+            result['distance'] = self.get_distance(ref_coords, result['coords'])
             
             # Copy station name to clipboard for easy copy-paste into game
             pyperclip.copy(result['station'])
@@ -1,15 +1,56 @@
-import json
 from pathlib import Path
-from typing import Optional, Dict, List
+from datetime import timedelta
+from typing import Optional, Dict, List, Iterator
 import os
+import fnmatch
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+import requests_cache
+from selectolax.lexbor import LexborHTMLParser
 import time
 import re
-import pyttsx3
 import sys
 import pyperclip
 import argparse
+from ed_speech import Speaker
+
+# Cache edtools.cc responses in the user cache folder so re-running the scripts while mining is instant.
+# Hotspot results are only worth keeping for a few minutes
+CACHE_NAME = 'edtools_cache'
+CACHE_TTL = timedelta(minutes=10)
+
+# Common material name variations that need to be normalized for edtools.cc
+MATERIAL_NAMES = {
+    'Void Opal': 'Opal',
+    'Void Opals': 'Opal',
+    'Low Temperature Diamond': 'LowTemperatureDiamond',
+    'Low Temperature Diamonds': 'LowTemperatureDiamond',
+    'LTDs': 'LowTemperatureDiamond',
+    'LTD': 'LowTemperatureDiamond'
+}
+
+# Splits "<ring name><hotspot list>" - hotspot materials all end in 'ite' or 'ond'
+RING_NAME_RE = re.compile(r'(.+?)([A-Z][a-z]+(?:ite|ond).*)')
+
+def read_lines_reversed(path: os.PathLike, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield the lines of a file from last to first, reading it backwards in blocks.
+    Journals keep growing all session, but we usually only need the last few events."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        partial_line = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + partial_line).split(b'\n')
+            # The first line may continue in the previous block, so keep it for later
+            partial_line = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if partial_line.strip():
+            yield partial_line
 
 class EDMiningFinder:
     def __init__(self, journal_path: Optional[Path] = None, voice_enabled: bool = True):
@@ -22,27 +63,36 @@ class EDMiningFinder:
             'Accept-Language': 'en-US,en;q=0.9',
             'Referer': 'https://edtools.cc/'
         }
-        self.engine = pyttsx3.init() if voice_enabled else None
+        # Reuse one session so requests to edtools.cc share a kept-alive connection,
+        # and repeated searches are answered from the on-disk cache
+        self.session = requests_cache.CachedSession(CACHE_NAME, backend='sqlite', use_cache_dir=True, expire_after=CACHE_TTL)
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        # Text-to-speech is slow to start up, so it's only initialized the first time we speak
+        self.voice_enabled = voice_enabled
+        self.speaker = Speaker()
 
     def get_current_system_info(self) -> Optional[Dict]:
         """Read the latest journal file to find current system information..."""
         if not self.journal_path.exists():
             raise FileNotFoundError(f"Journal directory not found at {self.journal_path}")
         
-        # Get the latest journal file
-        journal_files = list(self.journal_path.glob("Journal.*.log"))
+        # Get the latest journal file - scandir entries come with their stat info
+        # cached on Windows, so this doesn't need a separate call per journal
+        with os.scandir(self.journal_path) as entries:
+            journal_files = [entry for entry in entries if fnmatch.fnmatch(entry.name, "Journal.*.log")]
         if not journal_files:
             raise FileNotFoundError("No journal files found")
         
         latest_journal = max(journal_files, key=lambda x: x.stat().st_mtime)
         
         # Read the journal file from the end to find the last FSDJump or Location event
-        with open(latest_journal, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        for line in reversed(lines):
+        for line in read_lines_reversed(latest_journal):
+            # Most lines are other events - skip them without paying for a full JSON parse
+            if b'"FSDJump"' not in line and b'"Location"' not in line:
+                continue
             try:
-                event = json.loads(line)
+                event = orjson.loads(line)
                 if event['event'] in ['FSDJump', 'Location']:
                     self.current_system = event['StarSystem']
                     self.current_system_info = {
@@ -58,23 +108,14 @@ class EDMiningFinder:
                         'allegiance': event.get('SystemAllegiance')
                     }
                     return self.current_system_info
-            except (json.JSONDecodeError, KeyError):
+            except (orjson.JSONDecodeError, KeyError):
                 continue
         
         return None
 
     def normalize_material(self, material: str) -> str:
         """Convert material names to the format expected by edtools.cc"""
-        # Common variations that need to be normalized
-        mapping = {
-            'Void Opal': 'Opal',
-            'Void Opals': 'Opal',
-            'Low Temperature Diamond': 'LowTemperatureDiamond',
-            'Low Temperature Diamonds': 'LowTemperatureDiamond',
-            'LTDs': 'LowTemperatureDiamond',
-            'LTD': 'LowTemperatureDiamond'
-        }
-        return mapping.get(material, material)
+        return MATERIAL_NAMES.get(material, material)
 
     def get_hotspots(self, material: str = "Opal") -> List[Dict]:
         """
@@ -95,45 +136,43 @@ class EDMiningFinder:
         
         try:
             # Single request is enough, the data is returned directly
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            tree = LexborHTMLParser(response.text)
             
-            # Find the results table - it has id="sys_tbl"
-            table = soup.find('table', {'id': 'sys_tbl'})
-            if not table:
+            # Find the rows of the results table (it has id="sys_tbl") in a single query
+            rows = tree.css('table#sys_tbl tr')[1:]  # Skip header row
+            if not rows:
                 return []
                 
             hotspots = []
-            rows = table.find_all('tr')[1:]  # Skip header row
-            if not rows:
-                return []
             
             for row in rows:
-                cols = row.find_all('td')
+                cols = row.css('td')
                 if len(cols) >= 7:  # We expect 7 columns
                     try:
                         # Get system name (removing the copy button)
-                        system_cell = cols[1].find('span')
+                        system_cell = cols[1].css_first('span')
                         if system_cell:
                             # Look for the actual system name in the data-clipboard-text attribute
-                            copy_button = system_cell.find('a', {'class': 'btn'})
+                            copy_button = system_cell.css_first('a.btn')
                             if copy_button:
-                                system_name = copy_button.get('data-clipboard-text', '').strip()
+                                system_name = (copy_button.attributes.get('data-clipboard-text') or '').strip()
                             else:
-                                system_name = system_cell.text.strip().split()[-1]
+                                system_name = system_cell.text().strip().split()[-1]
                         else:
-                            system_name = cols[1].text.strip()
+                            system_name = cols[1].text().strip()
                         
                         # Get ring info and parse hotspots from tooltip
-                        ring_cell = cols[2].find('span', {'class': 'hvr'})
+                        ring_cell = cols[2].css_first('span.hvr')
+                        
+                        ring_text = ring_cell.text() if ring_cell else cols[2].text().strip()
                         
                         # Split ring name from hotspots
                         try:
                             # Find the first occurrence of a material (they all end in 'ite' or 'ond')
-                            ring_text = ring_cell.text if ring_cell else cols[2].text.strip()
-                            matches = re.search(r'(.+?)([A-Z][a-z]+(?:ite|ond).*)', ring_text)
+                            matches = RING_NAME_RE.search(ring_text)
                             if matches:
                                 ring_name = matches.group(1).strip()
                                 hotspots_text = matches.group(2)
@@ -141,24 +180,24 @@ class EDMiningFinder:
                                 ring_name = ring_text
                                 hotspots_text = ""
                         except Exception:
-                            ring_name = ring_cell.text if ring_cell else cols[2].text.strip()
+                            ring_name = ring_text
                             hotspots_text = ""
                         
-                        tooltip = ring_cell.find('span', {'class': 'ttip'}) if ring_cell else None
+                        tooltip = ring_cell.css_first('span.ttip') if ring_cell else None
                         hotspot_details = []
                         if tooltip:
                             # Each line in tooltip is a "Material:Count" pair
-                            hotspot_details = [line.strip() for line in tooltip.text.strip().split('\n')]
+                            hotspot_details = [line.strip() for line in tooltip.text().strip().split('\n')]
                         
                         # Parse ring density and its details from the tooltip
-                        density_cell = cols[6].find('span', {'class': 'hvr'})
-                        density_text = density_cell.text.strip().split('M=')[0] if density_cell else '0'
+                        density_cell = cols[6].css_first('span.hvr')
+                        density_text = density_cell.text().strip().split('M=')[0] if density_cell else '0'
                         
-                        density_tooltip = density_cell.find('span', {'class': 'ttip'}) if density_cell else None
+                        density_tooltip = density_cell.css_first('span.ttip') if density_cell else None
                         density_details = {}
                         if density_tooltip:
                             # Split by <br/> tags first, then process each part
-                            details = [d.strip() for d in density_tooltip.text.split('Inner=')]
+                            details = [d.strip() for d in density_tooltip.text().split('Inner=')]
                             if len(details) >= 1 and details[0].startswith('M='):
                                 try:
                                     density_details['M'] = float(details[0][2:].replace(',', ''))
@@ -175,18 +214,18 @@ class EDMiningFinder:
                         
                         hotspot = {
                             'system': system_name,
-                            'distance': float(cols[0].text.strip()),
+                            'distance': float(cols[0].text().strip()),
                             'ring_name': ring_name,
-                            'ring_type': cols[3].text.strip(),
-                            'hotspot_count': int(cols[4].text.strip()),
-                            'distance_to_arrival': int(cols[5].text.strip().replace(',', '')),
+                            'ring_type': cols[3].text().strip(),
+                            'hotspot_count': int(cols[4].text().strip()),
+                            'distance_to_arrival': int(cols[5].text().strip().replace(',', '')),
                             'ring_density': float(density_text),
                             'ring_details': density_details,
                             'hotspots': hotspot_details
                         }
                         
                         # Check if system is populated (has a * mark)
-                        populated_mark = cols[1].find('span', {'class': 'gr'})
+                        populated_mark = cols[1].css_first('span.gr')
                         hotspot['populated'] = bool(populated_mark)
                         
                         hotspots.append(hotspot)
@@ -207,9 +246,8 @@ class EDMiningFinder:
 
     def speak(self, text: str):
         """Speak the given text using text-to-speech"""
-        if self.engine:
-            self.engine.say(text)
-            self.engine.runAndWait()
+        if self.voice_enabled:
+            self.speaker.say(text)
 
 def parse_args():
     """Parse command line arguments"""
@@ -270,7 +308,7 @@ def main():
                 spot = min(hotspots, key=lambda x: x['distance'])
                 
                 # Format system name for reading (only if voice enabled)
-                system_name = ' '.join(spot['system']) if finder.engine else spot['system']
+                system_name = ' '.join(spot['system']) if finder.voice_enabled else spot['system']
                 
                 # Copy system name to clipboard (use original, not spelled out)
                 pyperclip.copy(spot['system'])
@@ -288,7 +326,7 @@ def main():
                 print(output)
                 print("(System name copied to clipboard)")
                 
-                if finder.engine:
+                if finder.voice_enabled:
                     finder.speak(output)
             else:
                 msg = f"No suitable hotspots found (min density: {args.min_density}, max distance: {args.max_distance}ly"
@@ -296,13 +334,13 @@ def main():
                     msg += f", ring type: {args.ring_type}"
                 msg += ")"
                 print(msg)
-                if finder.engine:
+                if finder.voice_enabled:
                     finder.speak(msg)
         else:
             # Use original material name in error message for clarity
             msg = f"No hotspots found for {args.material}"
             print(msg)
-            if finder.engine:
+            if finder.voice_enabled:
                 finder.speak(msg)
                 
     except FileNotFoundError as e:
@@ -0,0 +1,43 @@
+import atexit
+import queue
+import threading
+import pyttsx3
+
+class Speaker:
+    """Text-to-speech on a background thread, shared by both assistants.
+    Phrases play while the script finishes up, and are all spoken before it exits."""
+
+    def __init__(self):
+        self.phrases = queue.Queue()
+        self.thread = None
+
+    def say(self, text: str):
+        """Queue the text to be spoken, starting the speech thread on first use"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            # Let queued phrases finish before the interpreter shuts down
+            atexit.register(self.wait)
+        self.phrases.put(text)
+
+    def _run(self):
+        # The engine has to be created and used on the same thread (it's COM-based on Windows)
+        try:
+            engine = pyttsx3.init()
+        except Exception as e:
+            print(f"Error: {e}")
+            return
+
+        for text in iter(self.phrases.get, None):
+            try:
+                engine.say(text)
+                engine.runAndWait()
+            except Exception as e:
+                print(f"Error: {e}")
+
+    def wait(self):
+        """Block until everything queued up has been said"""
+        if self.thread is not None:
+            self.phrases.put(None)
+            self.thread.join()
+            self.thread = None